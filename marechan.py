@@ -1,17 +1,26 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import logging
 import sys
 import os
 import json
+import functools
+import dataclasses
 import configparser
 
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
 from utils.logger import Logger
 from utils.email_parser import EmailParser
 from utils.ai_client import AIClient
 from utils.prompt_enhancer import PromptEnhancer
 from utils.response_formatter import ResponseFormatter
 from utils.email_sender import EmailSender
+from utils.models import Assistant, MareConfig
 
 def get_script_directory():
     """
@@ -22,123 +31,169 @@ def get_script_directory():
     """
     return os.path.dirname(os.path.abspath(__file__))
 
+@functools.lru_cache(maxsize=4)
+def _load_config_cached(config_path, mtime):
+    """
+    Parse the configuration file, memoized on its path and modification time
+
+    Args:
+        config_path: Path of the configuration file
+        mtime: Modification time of the file in nanoseconds (cache key only)
+
+    Returns:
+        MareConfig: Configuration snapshot
+    """
+    config = configparser.ConfigParser()
+    config.read(config_path)
+    return MareConfig.from_parser(config)
+
+@functools.lru_cache(maxsize=4)
+def _load_assistants_cached(assistants_path, mtime):
+    """
+    Parse the assistants file, memoized on its path and modification time
+
+    Args:
+        assistants_path: Path of the assistants file
+        mtime: Modification time of the file in nanoseconds (cache key only)
+
+    Returns:
+        dict: Assistants by name
+    """
+    with open(assistants_path, 'rb') as file:
+        data = file.read()
+
+    # msgspec decodes JSON in C; fall back to the stdlib parser when it is not installed
+    if msgspec is not None:
+        raw_assistants = msgspec.json.decode(data)
+    else:
+        raw_assistants = json.loads(data)
+
+    return {name: Assistant.from_dict(name, data) for name, data in raw_assistants.items()}
+
 def load_config():
     """
     Load configuration from the config.conf file
 
     Returns:
-        configparser.ConfigParser: Configuration object
+        MareConfig: Configuration snapshot
     """
-    config = configparser.ConfigParser()
     script_dir = get_script_directory()
     config_path = os.path.join(script_dir, 'config.conf')
 
-    if not os.path.exists(config_path):
+    try:
+        mtime = os.stat(config_path).st_mtime_ns
+    except FileNotFoundError:
         print(f"Configuration file 'config.conf' not found at {config_path}!")
         sys.exit(1)
 
-    config.read(config_path)
-    return config
+    return _load_config_cached(config_path, mtime)
 
 def load_assistants():
     """
     Load assistants configuration from the assistants.json file
 
     Returns:
-        dict: Assistants configuration
+        dict: Assistants by name
     """
     script_dir = get_script_directory()
     assistants_path = os.path.join(script_dir, 'assistants.json')
 
-    if not os.path.exists(assistants_path):
+    try:
+        mtime = os.stat(assistants_path).st_mtime_ns
+    except FileNotFoundError:
         print(f"Assistants configuration file 'assistants.json' not found at {assistants_path}!")
         sys.exit(1)
 
-    with open(assistants_path, 'r') as file:
-        return json.load(file)
+    return _load_assistants_cached(assistants_path, mtime)
 
 def process_email():
     """
     Process an email received via standard input
     """
     config = load_config()
-    assistants_config = load_assistants()
+    assistants = load_assistants()
 
     logger = Logger(config)
     logger.log_message("Script started")
 
     try:
-        raw_email = sys.stdin.read()
+        raw_email = sys.stdin.buffer.read()
         logger.log_message(f"Email received, length: {len(raw_email)}")
 
         logger.log_raw_email(raw_email)
 
-        email_parser = EmailParser(logger)
-        prompt_enhancer = PromptEnhancer(logger)
+        email_parser = EmailParser(logger, assistants)
+        prompt_enhancer = PromptEnhancer(config, logger)
         ai_client = AIClient(config, logger)
         response_formatter = ResponseFormatter(config, logger)
         email_sender = EmailSender(logger)
 
         email_data = email_parser.extract_email_content(raw_email)
 
-        if email_parser.is_no_reply_address(email_data['sender'], assistants_config):
+        if email_parser.is_no_reply_address(email_data['sender']):
             logger.log_message("Sender is a no-reply address. No response will be sent.")
             return
 
-        default_assistant = config.get('General', 'default_assistant')
-        assistant_name = email_parser.detect_assistant(email_data, assistants_config, default_assistant)
+        assistant_name = email_parser.detect_assistant(email_data, config.default_assistant)
 
-        if assistant_name in assistants_config:
-            assistant_config = assistants_config[assistant_name]
+        if assistant_name in assistants:
+            assistant = assistants[assistant_name]
         else:
-            assistant_config = assistants_config.get('default', {})
+            assistant = dataclasses.replace(
+                assistants.get('default', Assistant(name='default')),
+                name=assistant_name
+            )
             logger.log_message(f"Assistant {assistant_name} not found, using default")
 
-        assistant_config['name'] = assistant_name
-
         ai_response = ai_client.ask_ai(
             email_data['content'],
             email_data['sender'],
-            assistant_config,
+            assistant,
             prompt_enhancer
         )
 
-        response_data = ai_client.process_ai_response(ai_response, assistant_config)
+        response_data = ai_client.process_ai_response(ai_response, assistant)
+
+        # The Discord upload runs in the background while the reply goes out over SMTP
+        logger.send_log_to_discord(email_data, response_data, assistant_name)
 
         email_sender.send_response(
             email_data['sender'],
             email_data['subject'],
             response_data,
-            assistant_config,
+            assistant,
             response_formatter
         )
 
-        logger.send_log_to_discord(email_data, response_data, assistant_name)
-
     except Exception as e:
         error_msg = f"Error during processing: {str(e)}"
-        logger.log_message(f"CRITICAL ERROR: {error_msg}")
+        logger.log_message(f"CRITICAL ERROR: {error_msg}", level=logging.CRITICAL)
         try:
             if 'email_data' in locals() and 'sender' in email_data:
                 error_response = {
                     'message': "Sorry, an error occurred while processing your email."
                 }
-                if 'assistant_config' not in locals():
-                    assistant_config = assistants_config.get('default', {})
+                if 'assistant' not in locals():
+                    assistant = assistants.get('default', Assistant(name='default'))
+
+                logger.send_log_to_discord(email_data, error_response, 'error')
 
                 email_sender.send_response(
                     email_data['sender'],
                     email_data.get('subject', 'Error'),
                     error_response,
-                    assistant_config,
-                    response_formatter
+                    assistant,
+                    response_formatter,
+                    skip_html=True
                 )
-
-                logger.send_log_to_discord(email_data, error_response, 'error')
         except Exception as e2:
-            logger.log_message(f"Error sending error response: {str(e2)}")
+            logger.log_message(f"Error sending error response: {str(e2)}", level=logging.ERROR)
     finally:
         logger.log_message("Done")
+        # Give the Discord upload a bounded wait, then release the log files,
+        # so a process handling several emails doesn't accumulate loggers
+        logger.wait_for_pending()
+        logger.close()
 
 if __name__ == "__main__":
     process_email()
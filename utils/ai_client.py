@@ -1,74 +1,99 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import logging
 import requests
 
+from utils.http_session import get_session
+
+# Reply used when the AI API does not answer within the configured timeout
+UNAVAILABLE_MESSAGE = "Sorry, the AI service is currently unavailable. Please try again later."
+
 class AIClient:
     def __init__(self, config, logger):
         """
         Initialize the client for the AI API
 
         Args:
-            config: Configuration containing API parameters
+            config: MareConfig containing API parameters
             logger: Logger instance to log events
         """
-        self.api_url = config.get('API', 'url')
-        self.timeout = config.getint('API', 'timeout')
+        self.api_url = config.api_url
+        self.timeout = config.api_timeout
+        # POST sends the content as a form body, avoiding URL percent-encoding and length limits
+        self.method = config.api_method
+        self.max_content_length = config.api_max_content_length
+        self.session = get_session()
         self.logger = logger
 
-    def ask_ai(self, content, sender, assistant_config, prompt_enhancer=None):
+    def ask_ai(self, content, sender, assistant, prompt_enhancer=None):
         """
         Query the AI API with specific content
 
         Args:
             content: The content to send to the API
             sender: The sender's email address
-            assistant_config: The assistant configuration
+            assistant: The Assistant to answer as
             prompt_enhancer: Instance of PromptEnhancer (optional)
 
         Returns:
-            tuple: (response, assistant_name)
+            requests.Response: API response, or None if the API timed out
 
         Raises:
             Exception: If an error occurs during the API call
         """
         try:
-            base_prompt = assistant_config.get('prompt', 'Reply to the following prompt:')
-            assistant_name = assistant_config.get('name', 'assistant')
+            base_prompt = assistant.prompt
 
-            self.logger.log_message(f"Calling AI API for assistant: {assistant_name}...")
+            self.logger.log_message(f"Calling AI API for assistant: {assistant.name}...")
 
-            if assistant_config.get('enhance_prompt', False) and prompt_enhancer:
-                enhancements = assistant_config.get('enhancements', [])
-                enriched_prompt = prompt_enhancer.enhance_prompt(base_prompt, enhancements)
+            if assistant.enhance_prompt and prompt_enhancer:
+                enriched_prompt = prompt_enhancer.enhance_prompt(base_prompt, assistant.enhancements)
             else:
                 enriched_prompt = base_prompt
 
-            full_content = f"{enriched_prompt} Reminder: You are talking to the sender ({sender}) of this mail! {content}"
+            if len(content) > self.max_content_length:
+                self.logger.log_message(f"Email content truncated from {len(content)} to {self.max_content_length} characters")
+                content = content[:self.max_content_length]
+
+            full_content = ''.join((
+                enriched_prompt,
+                ' Reminder: You are talking to the sender (', sender, ') of this mail! ',
+                content
+            ))
 
-            params = {'content': full_content, 'timeout': self.timeout}
-            response = requests.get(self.api_url, params=params)
+            if self.method == 'POST':
+                response = self.session.post(self.api_url, data={'content': full_content}, timeout=self.timeout)
+            else:
+                response = self.session.get(self.api_url, params={'content': full_content}, timeout=self.timeout)
 
             self.logger.log_message(f"API response status: {response.status_code}")
 
             return response
+        except requests.Timeout:
+            self.logger.log_message(f"AI API did not answer within {self.timeout}s")
+            return None
         except Exception as e:
-            self.logger.log_message(f"ERROR in ask_ai: {str(e)}")
+            self.logger.log_message(f"ERROR in ask_ai: {str(e)}", level=logging.ERROR)
             raise e
 
-    def process_ai_response(self, response, assistant_config):
+    def process_ai_response(self, response, assistant):
         """
         Process the AI API response
 
         Args:
-            response: API response
-            assistant_config: Assistant configuration
+            response: API response, or None if the API timed out
+            assistant: The Assistant that answered
 
         Returns:
             dict: Processed response data
         """
         try:
-            if response.status_code == 200:
+            if response is None:
+                return {
+                    'message': UNAVAILABLE_MESSAGE
+                }
+            elif response.status_code == 200:
                 ai_data = response.json()
                 self.logger.log_message(f"AI data received")
 
@@ -86,7 +111,7 @@ class AIClient:
                     'message': f"Error communicating with the AI: {response.status_code}"
                 }
         except Exception as e:
-            self.logger.log_message(f"ERROR in process_ai_response: {str(e)}")
+            self.logger.log_message(f"ERROR in process_ai_response: {str(e)}", level=logging.ERROR)
             return {
                 'message': f"Error processing AI response: {str(e)}"
             }
@@ -1,24 +1,46 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
-import email
+import logging
+import re
+from email import policy
+from email.parser import BytesParser
+
+# Local parts and words typical of automated senders that must never get a reply
+_NOREPLY_RE = re.compile(r'(?:no-?reply|daemon|mailer-daemon|postmaster)', re.I)
 
 class EmailParser:
-    def __init__(self, logger):
+    def __init__(self, logger, assistants=None):
         """
         Initialize the email parser
 
         Args:
             logger: Logger instance to log events
+            assistants: Dict of Assistant instances by name (optional)
         """
         self.logger = logger
+        assistants = assistants or {}
+
+        # Lowercased sender addresses of every assistant, computed once
+        self._assistant_emails = frozenset(
+            assistant.email_sender.lower()
+            for assistant in assistants.values()
+        )
+
+        # Lowercased assistant names, for an exact local-part lookup and a substring fallback
+        self._assistant_index = {
+            name.lower(): name
+            for name in assistants
+            if name != "default"
+        }
+        self._assistant_names = tuple(self._assistant_index.items())
 
     def extract_email_content(self, raw_email):
         """
         Extract content from a raw email
 
         Args:
-            raw_email: The raw email to process
+            raw_email: The raw email to process, as bytes
 
         Returns:
             dict: Dictionary containing email data
@@ -27,21 +49,27 @@ class EmailParser:
             Exception: If an error occurs during extraction
         """
         try:
-            msg = email.message_from_string(raw_email)
+            msg = BytesParser(policy=policy.default).parsebytes(raw_email)
 
             sender = msg['From']
             subject = msg['Subject'] or "No subject"
             recipient = msg['To']
 
-            content = ""
-            if msg.is_multipart():
-                for part in msg.get_payload():
-                    if part.get_content_type() == 'text/plain':
-                        content += part.get_payload(decode=True).decode('utf-8', errors='ignore')
-            else:
-                content = msg.get_payload(decode=True).decode('utf-8', errors='ignore')
-
-            content = content.strip()
+            # walk() also descends into nested multiparts (e.g. mixed > alternative)
+            parts = [
+                self._get_text(part) for part in msg.walk()
+                if part.get_content_type() == 'text/plain' and not part.is_attachment()
+            ]
+
+            # No inline plain text: use the HTML body, or the raw payload of a single-part email
+            if not parts:
+                body = msg.get_body(preferencelist=('plain', 'html'))
+                if body is not None:
+                    parts = [self._get_text(body)]
+                elif not msg.is_multipart():
+                    parts = [msg.get_payload(decode=True).decode('utf-8', errors='ignore')]
+
+            content = ''.join(parts).strip()
             self.logger.log_message(f"From: {sender}, To: {recipient}, Subject: {subject}")
             self.logger.log_message(f"Content extracted: {content[:100]}...")
 
@@ -52,43 +80,49 @@ class EmailParser:
                 'content': content
             }
         except Exception as e:
-            self.logger.log_message(f"ERROR extracting email: {str(e)}")
+            self.logger.log_message(f"ERROR extracting email: {str(e)}", level=logging.ERROR)
             raise e
 
-    def is_no_reply_address(self, sender_email, assistants_config=None):
+    @staticmethod
+    def _get_text(part):
+        """
+        Decode the text of a MIME part
+
+        Args:
+            part: The text part to decode
+
+        Returns:
+            str: Decoded text of the part
+        """
+        # No charset declared (get_content() would assume ASCII) or an unknown one: assume UTF-8
+        if part.get_content_charset() is not None:
+            try:
+                return part.get_content()
+            except LookupError:
+                pass
+        return part.get_payload(decode=True).decode('utf-8', errors='ignore')
+
+    def is_no_reply_address(self, sender_email):
         """
         Check if the email address is a no-reply address or an assistant address
 
         Args:
             sender_email: The email address to check
-            assistants_config: Assistants configuration (optional)
 
         Returns:
             bool: True if it's a no-reply or assistant address, False otherwise
         """
-        sender_email = sender_email.lower()
-
-        # Check if it's a standard no-reply address
-        if 'noreply' in sender_email or 'no-reply' in sender_email or 'daemon' in sender_email:
+        if _NOREPLY_RE.search(sender_email):
             return True
 
-        # Check if it's an assistant address
-        if assistants_config:
-            for assistant_name, config in assistants_config.items():
-                if 'email' in config and 'sender' in config['email']:
-                    assistant_email = config['email']['sender'].lower()
-                    if sender_email == assistant_email:
-                        return True
-
-        return False
+        return sender_email.lower() in self._assistant_emails
 
-    def detect_assistant(self, email_data, assistants_config, default_assistant):
+    def detect_assistant(self, email_data, default_assistant):
         """
         Detect the assistant to use based on email data
 
         Args:
             email_data: Email data
-            assistants_config: Assistants configuration
             default_assistant: Name of the default assistant
 
         Returns:
@@ -96,13 +130,16 @@ class EmailParser:
         """
         recipient_email = email_data['recipient'].lower()
 
-        # Check each configured assistant
-        for assistant_name in assistants_config:
-            if assistant_name == "default":
-                continue
-
+        # Common case: the recipient local part is the assistant name
+        local_part = recipient_email.split('@', 1)[0].rsplit('<', 1)[-1].strip()
+        assistant_name = self._assistant_index.get(local_part)
+        if assistant_name:
+            self.logger.log_message(f"Detected assistant: {assistant_name}")
+            return assistant_name
 
-            if assistant_name.lower() in recipient_email:
+        # Check each configured assistant
+        for lower_name, assistant_name in self._assistant_names:
+            if lower_name in recipient_email:
                 self.logger.log_message(f"Detected assistant: {assistant_name}")
                 return assistant_name
 
@@ -1,10 +1,28 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import logging
+import atexit
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.utils import formatdate
+from email.utils import formatdate, formataddr, parseaddr
+
+# Authenticated SMTP connections, keyed by (server, port, user)
+_SMTP_POOL = {}
+
+def _close_smtp_pool():
+    """
+    Close every pooled SMTP connection
+    """
+    for smtp in _SMTP_POOL.values():
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+    _SMTP_POOL.clear()
+
+atexit.register(_close_smtp_pool)
 
 class EmailSender:
     def __init__(self, logger):
@@ -16,7 +34,44 @@ class EmailSender:
         """
         self.logger = logger
 
-    def send_response(self, to_email, original_subject, response_data, assistant_config, html_formatter):
+    def _get_smtp(self, server, port, user, password):
+        """
+        Get an authenticated SMTP connection, reusing a pooled one when it is still alive
+
+        Args:
+            server: SMTP server hostname
+            port: SMTP server port
+            user: SMTP username (may be empty)
+            password: SMTP password (may be empty)
+
+        Returns:
+            smtplib.SMTP: Connected and authenticated SMTP connection
+        """
+        key = (server, port, user)
+        smtp = _SMTP_POOL.get(key)
+
+        if smtp is not None:
+            try:
+                smtp.noop()
+                return smtp
+            except (smtplib.SMTPException, OSError):
+                self.logger.log_message(f"Pooled SMTP connection to {server}:{port} is dead, reconnecting")
+                _SMTP_POOL.pop(key, None)
+
+        if port == 465:
+            smtp = smtplib.SMTP_SSL(server, port)
+        else:
+            smtp = smtplib.SMTP(server, port)
+            if port == 587:  # Use STARTTLS for port 587
+                smtp.starttls()
+
+        if user and password:
+            smtp.login(user, password)
+
+        _SMTP_POOL[key] = smtp
+        return smtp
+
+    def send_response(self, to_email, original_subject, response_data, assistant, html_formatter, skip_html=False):
         """
         Send a response via email
 
@@ -24,53 +79,48 @@ class EmailSender:
             to_email: Recipient's email address
             original_subject: Original subject of the email
             response_data: Response data
-            assistant_config: Assistant configuration
+            assistant: The Assistant sending the response
             html_formatter: HTML formatter to create the email content
+            skip_html: If True, send a text/plain message without rendering the HTML template
 
         Returns:
             bool: True if the email was sent successfully, False otherwise
         """
         try:
-            email_config = assistant_config.get('email', {})
-            sender_email = email_config.get('sender', 'no_sender_found@douxx.tech')
+            sender_email = assistant.email_sender
 
             subject = f"Re: {original_subject}" if original_subject else "Automatic response"
 
-            html_content = html_formatter.create_html_response(response_data, assistant_config)
-
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = sender_email
-            msg['To'] = to_email
-            msg['Date'] = formatdate(localtime=True)
+            if skip_html:
+                msg = MIMEText(response_data['message'], 'plain')
+            else:
+                html_content = html_formatter.create_html_response(response_data, assistant)
 
-            text_part = MIMEText(response_data['message'], 'plain')
-            msg.attach(text_part)
+                msg = MIMEMultipart('alternative')
 
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
+                text_part = MIMEText(response_data['message'], 'plain')
+                msg.attach(text_part)
 
-            smtp_server = email_config.get('smtp_server', 'localhost')
-            smtp_port = email_config.get('smtp_port', 587)
-            smtp_user = email_config.get('smtp_user', '')
-            smtp_password = email_config.get('smtp_password', '')
+                html_part = MIMEText(html_content, 'html')
+                msg.attach(html_part)
 
-            if smtp_port == 465:
-                smtp = smtplib.SMTP_SSL(smtp_server, smtp_port)
-            else:
-                smtp = smtplib.SMTP(smtp_server, smtp_port)
-                if smtp_port == 587:  # Use STARTTLS for port 587
-                    smtp.starttls()
-
-            if smtp_user and smtp_password:
-                smtp.login(smtp_user, smtp_password)
+            msg['Subject'] = subject
+            msg['From'] = sender_email
+            # Re-encode the address, only the display name may be an encoded word
+            msg['To'] = formataddr(parseaddr(str(to_email)))
+            msg['Date'] = formatdate(localtime=True)
 
+            smtp = self._get_smtp(
+                assistant.smtp_server,
+                assistant.smtp_port,
+                assistant.smtp_user,
+                assistant.smtp_password
+            )
             smtp.send_message(msg)
-            smtp.quit()
 
             self.logger.log_message(f"Response sent successfully to {to_email}")
             return True
 
         except Exception as e:
-            self.logger.log_message(f"ERROR in send_response: {str(e)}")
+            self.logger.log_message(f"ERROR in send_response: {str(e)}", level=logging.ERROR)
             return False
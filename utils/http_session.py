@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+_SESSION = None
+
+def get_session():
+    """
+    Get the HTTP session shared by every component of the process
+
+    The session keeps connections alive and pooled, so repeated calls to the
+    same host skip the TCP and TLS handshakes
+
+    Returns:
+        requests.Session: Shared session
+    """
+    global _SESSION
+
+    if _SESSION is None:
+        session = requests.Session()
+        # Retry a failed connection once, but never a request the server may be
+        # processing: a read timeout must surface as requests.Timeout
+        retries = Retry(total=1, read=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retries)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _SESSION = session
+
+    return _SESSION
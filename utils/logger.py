@@ -1,80 +1,223 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import io
 import os
-import uuid
+import time
+import atexit
 import json
-import requests
+import logging
+import logging.handlers
+import threading
+import concurrent.futures
 from datetime import datetime
 
+from utils.http_session import get_session
+
+# Only the end of the temp log is attached to Discord
+DISCORD_LOG_TAIL = 64 * 1024
+
+# Directories already created by this process
+_ENSURED_DIRS = set()
+
+def _ensure_dir(path):
+    """
+    Create a directory if needed, at most once per process
+
+    Args:
+        path: Directory path to create
+    """
+    if path not in _ENSURED_DIRS:
+        os.makedirs(path, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+
+class _IsoFormatter(logging.Formatter):
+    """
+    Formatter writing timestamps in ISO 8601, like the original log format
+    """
+    def formatTime(self, record, datefmt=None):
+        return datetime.fromtimestamp(record.created).isoformat()
+
 class Logger:
     def __init__(self, config):
         """
         Initialize the logging system
 
         Args:
-            config: Configuration containing logging parameters
+            config: MareConfig containing logging parameters
         """
-        self.log_file = config.get('General', 'log_file')
-        self.raw_email_log = config.get('General', 'raw_email_log')
-        self.temp_log_dir = config.get('General', 'temp_log_dir')
-        self.discord_webhook_url = config.get('Discord', 'webhook_url', fallback=None)
+        self.log_file = config.log_file
+        self.raw_email_log = config.raw_email_log
+        self.temp_log_dir = config.temp_log_dir
+        self.discord_webhook_url = config.discord_webhook_url
+        self.session = get_session()
 
         # Create a session ID and a temporary file path
-        self.session_id = str(uuid.uuid4())
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.temp_log_filename = f"marechan_{timestamp}_{self.session_id}.txt"
+        self.session_id = os.urandom(6).hex()
+        self.temp_log_filename = f"marechan_{time.time_ns()}_{self.session_id}.txt"
         self.temp_log_path = os.path.join(self.temp_log_dir, self.temp_log_filename)
 
         # Ensure the temporary log directory exists
-        os.makedirs(self.temp_log_dir, exist_ok=True)
+        _ensure_dir(self.temp_log_dir)
 
         # Ensure the parent directory of the log files exists
-        os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
-        os.makedirs(os.path.dirname(self.raw_email_log), exist_ok=True)
+        _ensure_dir(os.path.dirname(self.log_file))
+        _ensure_dir(os.path.dirname(self.raw_email_log))
+
+        # Log lines are kept in memory and written to disk in batches
+        formatter = _IsoFormatter("%(asctime)s - %(message)s")
+        self._log_handler = self._buffered_handler(self.log_file, formatter)
+        self._temp_handler = self._buffered_handler(self.temp_log_path, formatter)
+        self._temp_handler.addFilter(lambda record: getattr(record, 'temp_log', True))
+
+        # Built directly rather than through getLogger() so the logging registry
+        # keeps no reference to it once the session is over
+        self._logger = logging.Logger(f"marechan.{self.session_id}", logging.INFO)
+        self._logger.propagate = False
+        self._logger.addHandler(self._log_handler)
+        self._logger.addHandler(self._temp_handler)
+        atexit.register(self.close)
+
+        # Discord uploads run on background threads so they don't delay the reply
+        self._pending = []
+        atexit.register(self.wait_for_pending)
 
         self.log_message("Logger initialized")
 
-    def log_message(self, message, temp_log=True):
+    @staticmethod
+    def _buffered_handler(path, formatter):
+        """
+        Create a handler buffering log records in memory before appending them to a file
+
+        Args:
+            path: Path of the log file
+            formatter: Formatter of the log lines
+
+        Returns:
+            logging.handlers.MemoryHandler: The buffering handler
+        """
+        file_handler = logging.FileHandler(path)
+        file_handler.setFormatter(formatter)
+        return logging.handlers.MemoryHandler(capacity=256, flushLevel=logging.ERROR, target=file_handler)
+
+    def flush(self):
+        """
+        Write the buffered log lines to the log files
+        """
+        self._log_handler.flush()
+        self._temp_handler.flush()
+
+    def close(self):
+        """
+        Flush and close the log files of the logger
+
+        Safe to call more than once; the atexit hooks are removed so a closed
+        logger doesn't stay referenced until the interpreter exits
+        """
+        for handler in (self._log_handler, self._temp_handler):
+            file_handler = handler.target
+            self._logger.removeHandler(handler)
+            handler.close()
+            if file_handler is not None:
+                file_handler.close()
+
+        atexit.unregister(self.close)
+        atexit.unregister(self.wait_for_pending)
+
+    def wait_for_pending(self, timeout=5):
+        """
+        Wait for the queued Discord uploads to finish
+
+        The uploads run on daemon threads, so an upload still running after
+        the timeout is abandoned when the process exits
+
+        Args:
+            timeout: Maximum number of seconds to wait
+        """
+        concurrent.futures.wait(self._pending, timeout=timeout)
+
+    @staticmethod
+    def _write_buffers(fp, buffers):
+        """
+        Append several byte buffers to an open file in as few syscalls as possible
+
+        Args:
+            fp: Open file object to write to
+            buffers: List of bytes to write in order
+        """
+        fp.flush()
+        if hasattr(os, 'writev'):
+            os.writev(fp.fileno(), buffers)
+        else:
+            os.write(fp.fileno(), b"".join(buffers))
+
+    def log_message(self, message, temp_log=True, level=logging.INFO):
         """
         Log a message to the log files
 
         Args:
             message: The message to log
             temp_log: If True, also log to the temporary file
+            level: Logging level of the message; ERROR and above write the
+                buffered lines to disk immediately
         """
-        log_entry = f"{datetime.now().isoformat()} - {message}\n"
-
-        with open(self.log_file, "a") as log:
-            log.write(log_entry)
-
-        if temp_log:
-            with open(self.temp_log_path, "a") as temp_log:
-                temp_log.write(log_entry)
+        self._logger.log(level, message, extra={'temp_log': temp_log})
 
     def log_raw_email(self, raw_email):
         """
         Log a raw email to the log files
 
         Args:
-            raw_email: The raw email to log
+            raw_email: The raw email to log, as bytes
         """
         try:
-            with open(self.raw_email_log, "a") as raw_log:
-                raw_log.write("==== NEW EMAIL BEGIN ====\n")
-                raw_log.write(raw_email)
-                raw_log.write("\n==== EMAIL END ====\n\n")
+            with open(self.raw_email_log, "ab") as raw_log:
+                self._write_buffers(raw_log, [
+                    b"==== NEW EMAIL BEGIN ====\n",
+                    raw_email,
+                    b"\n==== EMAIL END ====\n\n"
+                ])
 
-            with open(self.temp_log_path, "a") as temp_log:
-                temp_log.write("==== RAW EMAIL BEGIN ====\n")
-                temp_log.write(raw_email)
-                temp_log.write("\n==== RAW EMAIL END ====\n\n")
+            # Flush the buffered lines first so the raw email lands after them
+            self._temp_handler.acquire()
+            try:
+                self._temp_handler.flush()
+                with open(self.temp_log_path, "ab") as temp_log:
+                    self._write_buffers(temp_log, [
+                        b"==== RAW EMAIL BEGIN ====\n",
+                        raw_email,
+                        b"\n==== RAW EMAIL END ====\n\n"
+                    ])
+            finally:
+                self._temp_handler.release()
 
             self.log_message(f"Raw email logged to {self.raw_email_log} and temp log", temp_log=False)
         except Exception as e:
-            self.log_message(f"ERROR logging raw email: {str(e)}")
+            self.log_message(f"ERROR logging raw email: {str(e)}", level=logging.ERROR)
 
     def send_log_to_discord(self, email_data, response_data, assistant_name):
+        """
+        Queue a summary of the email processing to be sent to Discord in the background
+
+        Args:
+            email_data: Data of the processed email
+            response_data: Data of the sent response
+            assistant_name: Name of the assistant that processed the email
+
+        Returns:
+            concurrent.futures.Future: Resolves to True if sending was successful, False otherwise
+        """
+        future = concurrent.futures.Future()
+
+        def upload():
+            future.set_result(self._send_log_to_discord_impl(email_data, response_data, assistant_name))
+
+        # Unlike executor workers, a daemon thread is not joined at exit
+        threading.Thread(target=upload, name=f"marechan-discord-{self.session_id}", daemon=True).start()
+        self._pending.append(future)
+        return future
+
+    def _send_log_to_discord_impl(self, email_data, response_data, assistant_name):
         """
         Send a summary of the email processing to Discord
 
@@ -93,17 +236,18 @@ class Logger:
                 self.log_message("Discord webhook not configured, sending ignored")
                 return False
 
-            files = {
-                'file': (self.temp_log_filename, open(self.temp_log_path, 'rb'), 'text/plain')
-            }
-
             sender_name = email_data.get('sender', 'Unknown')
             if '<' in sender_name:
                 sender_name = sender_name.split('<')[0].strip()
 
+            cap_name = assistant_name.capitalize()
+            message = response_data.get('message', 'No response')
+            message_short = (message[:250] + '...') if len(message) > 250 else message
+            now = datetime.now()
+
             embed = {
-                "title": f"New response from {assistant_name.capitalize()}",
-                "description": f"{assistant_name.capitalize()} replied to an email from **{sender_name}**",
+                "title": f"New response from {cap_name}",
+                "description": f"{cap_name} replied to an email from **{sender_name}**",
                 "color": 0x2196F3,
                 "fields": [
                     {
@@ -113,37 +257,49 @@ class Logger:
                     },
                     {
                         "name": "Assistant",
-                        "value": assistant_name.capitalize(),
+                        "value": cap_name,
                         "inline": True
                     },
                     {
                         "name": "Response",
-                        "value": (response_data.get('message', '')[:250] + '...')
-                                if len(response_data.get('message', '')) > 250
-                                else response_data.get('message', 'No response')
+                        "value": message_short
                     }
                 ],
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now.isoformat()
             }
 
             payload = {
-                "content": f"📧 **New email processed by {assistant_name.capitalize()}** | {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}",
+                "content": f"📧 **New email processed by {cap_name}** | {now.strftime('%d/%m/%Y %H:%M:%S')}",
                 "embeds": [embed],
             }
 
-            response = requests.post(
+            self._temp_handler.flush()
+            with open(self.temp_log_path, 'rb') as temp_log:
+                temp_log.seek(0, os.SEEK_END)
+                size = temp_log.tell()
+                temp_log.seek(max(0, size - DISCORD_LOG_TAIL))
+                log_data = temp_log.read()
+
+            if size > DISCORD_LOG_TAIL:
+                # Start on a full line
+                log_data = log_data[log_data.find(b"\n") + 1:]
+
+            file_field = (self.temp_log_filename, io.BytesIO(log_data), 'text/plain')
+
+            response = self.session.post(
                 self.discord_webhook_url,
                 data={"payload_json": json.dumps(payload)},
-                files=files
+                files={'file': file_field},
+                timeout=10
             )
 
             if response.status_code == 200:
                 self.log_message(f"Log successfully sent to Discord (Status: {response.status_code})")
                 return True
             else:
-                self.log_message(f"Error sending to Discord: Status {response.status_code}, Response: {response.text}")
+                self.log_message(f"Error sending to Discord: Status {response.status_code}, Response: {response.text}", level=logging.ERROR)
                 return False
 
         except Exception as e:
-            self.log_message(f"ERROR in send_log_to_discord: {str(e)}")
+            self.log_message(f"ERROR in send_log_to_discord: {str(e)}", level=logging.ERROR)
             return False
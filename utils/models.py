@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class MareConfig:
+    """
+    Immutable snapshot of config.conf
+    """
+    log_file: str
+    raw_email_log: str
+    temp_log_dir: str
+    default_assistant: str
+    api_url: str
+    api_timeout: int
+    api_method: str
+    api_max_content_length: int
+    discord_webhook_url: str
+    html_template_path: str
+    service_manager: bool
+
+    @classmethod
+    def from_parser(cls, config):
+        """
+        Read every setting used by marechan from a parsed configuration
+
+        Args:
+            config: configparser.ConfigParser holding config.conf
+
+        Returns:
+            MareConfig: The configuration snapshot
+        """
+        return cls(
+            log_file=config.get('General', 'log_file'),
+            raw_email_log=config.get('General', 'raw_email_log'),
+            temp_log_dir=config.get('General', 'temp_log_dir'),
+            default_assistant=config.get('General', 'default_assistant'),
+            api_url=config.get('API', 'url'),
+            api_timeout=config.getint('API', 'timeout'),
+            api_method=config.get('API', 'method', fallback='GET').upper(),
+            api_max_content_length=config.getint('API', 'max_content_length', fallback=32768),
+            discord_webhook_url=config.get('Discord', 'webhook_url', fallback=None),
+            html_template_path=config.get('Templates', 'html_template_path', fallback='templates/message.html'),
+            service_manager=config.getboolean('Enhancements', 'service_manager', fallback=False)
+        )
+
+@dataclass(frozen=True)
+class Assistant:
+    """
+    Immutable snapshot of one assistant from assistants.json
+    """
+    name: str
+    email_sender: str = 'no_sender_found@douxx.tech'
+    prompt: str = 'Reply to the following prompt:'
+    enhance_prompt: bool = False
+    enhancements: tuple = ()
+    smtp_server: str = 'localhost'
+    smtp_port: int = 587
+    smtp_user: str = ''
+    smtp_password: str = ''
+
+    @classmethod
+    def from_dict(cls, name, data):
+        """
+        Build an assistant from its assistants.json entry
+
+        Args:
+            name: Name of the assistant (its key in assistants.json)
+            data: Configuration dict of the assistant
+
+        Returns:
+            Assistant: The assistant
+        """
+        defaults = cls(name=name)
+        email_config = data.get('email', {})
+
+        enhancements = data.get('enhancements', ())
+        if isinstance(enhancements, str):
+            enhancements = (enhancements,)
+
+        return cls(
+            name=name,
+            email_sender=email_config.get('sender', defaults.email_sender),
+            prompt=data.get('prompt', defaults.prompt),
+            enhance_prompt=bool(data.get('enhance_prompt', defaults.enhance_prompt)),
+            enhancements=tuple(enhancements),
+            smtp_server=email_config.get('smtp_server', defaults.smtp_server),
+            smtp_port=int(email_config.get('smtp_port', defaults.smtp_port)),
+            smtp_user=email_config.get('smtp_user', defaults.smtp_user),
+            smtp_password=email_config.get('smtp_password', defaults.smtp_password)
+        )
@@ -1,30 +1,687 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import logging
 import psutil
 import platform
-import requests
-import pytz
-from datetime import datetime
+from datetime import datetime, timezone
 import socket
 import uuid
 import os
 import locale
 import time
 import subprocess
+import shutil
+import threading
 import pwd
-from collections import defaultdict
+import re
+import functools
+import itertools
+from collections import Counter
+from heapq import nlargest
+from operator import itemgetter
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Facts that cannot change while the process runs are computed once
+_SYSTEM = platform.system()
+
+# Maximum number of seconds an external command may run
+_COMMAND_TIMEOUT = 2
+
+# PowerShell alone can take a second to start
+_POWERSHELL_TIMEOUT = 3
+
+# Maximum number of seconds to wait for the collectors of one prompt
+_COLLECT_TIMEOUT = 3
+
+# Shortest window a CPU or network rate is measured over; below it a single
+# packet or scheduler tick dominates, so the collector waits for the rest of it
+_SAMPLE_FLOOR = 0.25
+
+# Flag of /proc/<pid>/stat set on kernel threads (kworker, ksoftirqd, ...)
+_PF_KTHREAD = 0x00200000
+
+# Active service line of `service --status-all`: " [ + ]  name"
+_SVC_RE = re.compile(r'\s*\[\s*\+\s*\]\s+(\S+)')
+
+def _stream_lines(cmd, timeout=_COMMAND_TIMEOUT):
+    """
+    Run an external command and yield its output one line at a time
+
+    The output is read through a buffered pipe instead of being loaded whole,
+    and the command is killed if it runs longer than the timeout
+
+    Args:
+        cmd: Command and arguments, as a list
+        timeout: Maximum number of seconds the command may run
+
+    Yields:
+        str: Lines of the standard output, without the line break
+
+    Raises:
+        subprocess.CalledProcessError: If the command fails, so callers can fall back
+        subprocess.TimeoutExpired: If the command was killed for running too long
+    """
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, bufsize=1 << 16) as proc:
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        try:
+            for line in proc.stdout:
+                yield line.rstrip('\n')
+        finally:
+            timer.cancel()
+
+        returncode = proc.wait()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+@functools.lru_cache(maxsize=None)
+def _os_tuple():
+    """
+    Get the OS name and release
+
+    Returns:
+        tuple: (os name, os release)
+    """
+    return _SYSTEM, platform.release()
+
+@functools.lru_cache(maxsize=None)
+def _cpu_model():
+    """
+    Get the CPU model name
+
+    Returns:
+        str: CPU model name
+    """
+    try:
+        if _SYSTEM == "Windows":
+            return platform.processor()
+
+        # ARM kernels have no "model name" line, fall back to Hardware/Processor
+        fallback = None
+        with open('/proc/cpuinfo') as cpuinfo:
+            for line in cpuinfo:
+                key, _, value = line.partition(':')
+                key = key.strip()
+                if key == 'model name':
+                    return value.strip()
+                if fallback is None and key in ('Hardware', 'Processor'):
+                    fallback = value.strip()
+        return fallback or "Unknown CPU"
+    except OSError:
+        return "Unknown CPU"
+
+@functools.lru_cache(maxsize=None)
+def _mac_address():
+    """
+    Get the MAC address of the machine
+
+    Returns:
+        str: MAC address
+    """
+    node = f'{uuid.getnode():012x}'
+    return ':'.join(node[i:i + 2] for i in range(0, 12, 2))
+
+@functools.lru_cache(maxsize=None)
+def _bios_version():
+    """
+    Get the BIOS version (Windows only)
+
+    Returns:
+        str: BIOS version
+    """
+    bios_version = "Unknown"
+    if _SYSTEM == "Windows":
+        try:
+            import wmi
+            c = wmi.WMI()
+            for bios in c.Win32_BIOS():
+                bios_version = bios.Version
+        except:
+            pass
+    return bios_version
+
+@functools.lru_cache(maxsize=None)
+def _boot_mode():
+    """
+    Get the boot mode (Linux only)
+
+    Returns:
+        str: Boot mode
+    """
+    boot_mode = "Unknown"
+    if _SYSTEM == "Linux":
+        try:
+            if os.path.exists('/sys/firmware/efi'):
+                boot_mode = "UEFI"
+            else:
+                boot_mode = "Legacy BIOS"
+        except:
+            pass
+    return boot_mode
+
+@functools.lru_cache(maxsize=None)
+def _boot_datetime():
+    """
+    Get the time the system booted
+
+    Returns:
+        datetime: Local boot time
+    """
+    return datetime.fromtimestamp(psutil.boot_time())
+
+@functools.lru_cache(maxsize=None)
+def _system_users_list():
+    """
+    Get the accounts defined on the system
+
+    Returns:
+        tuple: System user names
+    """
+    system_users = []
+    try:
+        if _SYSTEM != "Windows":
+            # Unix method
+            for p in pwd.getpwall():
+                system_users.append(p[0])
+        else:
+            # Windows method
+            for line in _stream_lines(["net", "user"]):
+                line = line.strip()
+                if line and not line.startswith('-') and not line.startswith('User accounts') and not line.startswith('The command'):
+                    users = line.split()
+                    system_users.extend(users)
+    except:
+        pass
+    return tuple(system_users)
+
+def _run_in_thread(func, *args):
+    """
+    Run a function on a daemon thread
+
+    Unlike ThreadPoolExecutor workers, daemon threads are not joined at exit,
+    so a call stuck past its deadline cannot keep the process alive
+
+    Args:
+        func: Function to run
+        *args: Arguments passed to the function
+
+    Returns:
+        Future: Future resolved with the result or the exception of the call
+    """
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=f"marechan-{getattr(func, '__name__', 'collector')}", daemon=True).start()
+    return future
+
+def _linux_process_names():
+    """
+    Read the name of every user-space process straight from /proc (Linux only)
+
+    One small read of /proc/<pid>/stat per process, without the psutil
+    Process objects; names are truncated by the kernel to 15 characters.
+    Kernel threads are left out, they are neither services nor socket owners
+
+    Returns:
+        dict: {pid: process name}
+    """
+    names = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as stat:
+                line = stat.read()
+        except OSError:
+            # The process exited meanwhile
+            continue
+
+        # "pid (name) state ppid pgrp session tty_nr tpgid flags ...", the name may contain spaces or parentheses
+        start, end = line.find('('), line.rfind(')')
+        fields = line[end + 2:].split()
+        if len(fields) > 6 and int(fields[6]) & _PF_KTHREAD:
+            continue
+        names[int(entry)] = line[start + 1:end]
+    return names
+
+def _compile_matcher(keywords):
+    """
+    Build a case-insensitive function telling whether a name contains one of the keywords
+
+    The keywords are lowercased here once, and each name once per check.
+    An Aho-Corasick automaton scans the name once whatever the number of
+    keywords; a compiled regex alternation is used without pyahocorasick
+
+    Args:
+        keywords: Keywords to look for
+
+    Returns:
+        function: Takes a name, returns True if a keyword is found in it
+    """
+    keywords = tuple(keyword.lower() for keyword in keywords)
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for keyword in keywords:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return lambda name: next(automaton.iter(name.lower()), None) is not None
+
+    pattern = re.compile("|".join(map(re.escape, keywords)))
+    return lambda name: pattern.search(name.lower()) is not None
+
+@functools.lru_cache(maxsize=None)
+def _tz_examples():
+    """
+    Get a few of the timezones known to the system
+
+    Returns:
+        tuple: First five timezone names in alphabetical order
+    """
+    import zoneinfo
+    return tuple(itertools.islice(sorted(zoneinfo.available_timezones()), 5))
+
+def _safe_usage(mountpoint):
+    """
+    Get the usage of a mounted filesystem
+
+    Args:
+        mountpoint: Mount point of the filesystem
+
+    Returns:
+        psutil._common.sdiskusage: Disk usage or None if it can't be read
+    """
+    try:
+        return psutil.disk_usage(mountpoint)
+    except OSError:
+        return None
+
+def _ttl_cache(ttl):
+    """
+    Cache the result of a collector for a number of seconds
+
+    Results are kept per instance since the collectors depend on its state
+    (counter samples, configured service sources). Errors (None results) are
+    never cached so the next call retries. Concurrent callers of an expired
+    entry wait for one computation
+
+    Args:
+        ttl: Number of seconds a result stays valid
+
+    Returns:
+        function: Decorator caching the collector
+    """
+    def decorator(method):
+        name = method.__qualname__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            cached = self._cache.get(key)
+            if cached is not None and cached[1] > now:
+                return cached[0]
+
+            with self._cache_guard:
+                lock = self._cache_locks.setdefault(key, threading.Lock())
+
+            # Give up like a stuck collector instead of piling up behind one
+            if not lock.acquire(timeout=_COLLECT_TIMEOUT):
+                return None
+            try:
+                # Another caller may have filled the entry while we waited
+                now = time.monotonic()
+                cached = self._cache.get(key)
+                if cached is not None and cached[1] > now:
+                    return cached[0]
+
+                value = method(self, *args, **kwargs)
+                if value is not None:
+                    self._cache[key] = (value, time.monotonic() + ttl)
+                return value
+            finally:
+                lock.release()
+
+        return wrapper
+    return decorator
+
+def _render_time(time_info):
+    """
+    Render the current time section of the enhanced prompt
+
+    Args:
+        time_info: Result of PromptEnhancer.get_current_time_info
+
+    Returns:
+        list: Lines of the section
+    """
+    return [
+        f"Current time: {time_info['full']}",
+        f"UTC time: {time_info['utc']}"
+    ]
+
+def _render_system(sys_info):
+    """
+    Render the system section of the enhanced prompt
+
+    Args:
+        sys_info: Result of PromptEnhancer.get_system_info
+
+    Returns:
+        list: Lines of the section
+    """
+    return [
+        f"System: {sys_info['os']} {sys_info['version']}",
+        f"CPU: {sys_info['cpu_model']} ({sys_info['cpu_cores']} cores, {sys_info['cpu']}% usage)",
+        f"RAM: {sys_info['memory_gb']}GB total, {sys_info['memory']}% used",
+        f"Disk: {sys_info['disk_total']}GB total, {sys_info['disk_percent']}% used",
+        f"System uptime: {sys_info['uptime']}"
+    ]
+
+def _render_network(network_info):
+    """
+    Render the network section of the enhanced prompt
+
+    Args:
+        network_info: Result of PromptEnhancer.get_network_info
+
+    Returns:
+        list: Lines of the section
+    """
+    lines = []
+    lines.append(f"Network: IP {network_info['local_ip']}, hostname {network_info['hostname']}")
+    lines.append(f"Network interfaces: {', '.join(network_info['interfaces'])}")
+    if network_info['internet_available']:
+        lines.append(f"Internet connection: Available (latency: {network_info['latency']}ms)")
+    else:
+        lines.append("Internet connection: Unavailable")
+    return lines
+
+def _render_locale(locale_info):
+    """
+    Render the locale section of the enhanced prompt
+
+    Args:
+        locale_info: Result of PromptEnhancer.get_locale_info
+
+    Returns:
+        list: Lines of the section
+    """
+    return [
+        f"System locale: {locale_info['language']}, {locale_info['encoding']}",
+        f"Currency: {locale_info['currency']}",
+        f"Time format: {locale_info['time_format']}",
+        f"Date format: {locale_info['date_format']}"
+    ]
+
+def _render_timezone(timezone_info):
+    """
+    Render the timezone section of the enhanced prompt
+
+    Args:
+        timezone_info: Result of PromptEnhancer.get_timezone_info
+
+    Returns:
+        list: Lines of the section
+    """
+    return [
+        f"Timezone information:",
+        f"  Current timezone: {timezone_info['current']}",
+        f"  UTC offset: {timezone_info['utc_offset']}",
+        f"  DST active: {timezone_info['dst_active']}"
+    ]
+
+def _render_performance(perf_info):
+    """
+    Render the performance section of the enhanced prompt
+
+    Args:
+        perf_info: Result of PromptEnhancer.get_performance_metrics
+
+    Returns:
+        list: Lines of the section
+    """
+    return [
+        "System performance:",
+        f"  CPU load: 1min: {perf_info['load_1']}, 5min: {perf_info['load_5']}, 15min: {perf_info['load_15']}",
+        f"  Process count: {perf_info['process_count']}",
+        f"  Network usage: {perf_info['network_sent']}MB sent, {perf_info['network_recv']}MB received",
+        f"  Swap usage: {perf_info['swap_percent']}%"
+    ]
+
+def _render_hardware(hw_info):
+    """
+    Render the hardware section of the enhanced prompt
+
+    Args:
+        hw_info: Result of PromptEnhancer.get_hardware_info
+
+    Returns:
+        list: Lines of the section
+    """
+    return [
+        "Hardware information:",
+        f"  Machine type: {hw_info['machine_type']}",
+        f"  Processor: {hw_info['processor']}",
+        f"  BIOS version: {hw_info['bios_version']}",
+        f"  Boot mode: {hw_info['boot_mode']}"
+    ]
+
+def _render_users(users_info):
+    """
+    Render the users section of the enhanced prompt
+
+    Args:
+        users_info: Result of PromptEnhancer.get_users_info
+
+    Returns:
+        list: Lines of the section
+    """
+    lines = []
+    lines.append("Users information:")
+    lines.append(f"  Logged in users: {users_info['logged_users_count']}")
+    users_list = ", ".join(users_info['logged_users'][:5])
+    if len(users_info['logged_users']) > 5:
+        users_list += f" and {len(users_info['logged_users']) - 5} more"
+    lines.append(f"  Current users: {users_list}")
+    lines.append(f"  System users: {users_info['system_users_count']}")
+    lines.append(f"  User sessions: {users_info['sessions_count']}")
+    return lines
+
+def _render_network_traffic(traffic_info):
+    """
+    Render the network traffic section of the enhanced prompt
+
+    Args:
+        traffic_info: Result of PromptEnhancer.get_network_traffic
+
+    Returns:
+        list: Lines of the section
+    """
+    return [
+        "Network traffic:",
+        f"  Current download speed: {traffic_info['download_speed']} KB/s",
+        f"  Current upload speed: {traffic_info['upload_speed']} KB/s",
+        f"  Total downloaded: {traffic_info['total_received']} MB",
+        f"  Total uploaded: {traffic_info['total_sent']} MB",
+        f"  Packets received: {traffic_info['packets_recv']}",
+        f"  Packets sent: {traffic_info['packets_sent']}"
+    ]
+
+def _render_ports(ports_info):
+    """
+    Render the open ports section of the enhanced prompt
+
+    Args:
+        ports_info: Result of PromptEnhancer.get_open_ports
+
+    Returns:
+        list: Lines of the section
+    """
+    lines = []
+    lines.append("Open ports and connections:")
+    lines.append(f"  Total connections: {ports_info['total_connections']}")
+    lines.append(f"  Listening ports: {', '.join(map(str, ports_info['listening_ports'][:10]))}")
+    if len(ports_info['listening_ports']) > 10:
+        lines.append(f"    and {len(ports_info['listening_ports']) - 10} more...")
+    lines.append(f"  Established connections: {ports_info['established']}")
+    lines.append(f"  Top processes using network: {', '.join(ports_info['top_processes'])}")
+    return lines
+
+def _render_processes(processes_info):
+    """
+    Render the processes section of the enhanced prompt
+
+    Args:
+        processes_info: Result of PromptEnhancer.get_process_info
+
+    Returns:
+        list: Lines of the section
+    """
+    return [
+        "Process information:",
+        f"  Total processes: {processes_info['total']}",
+        f"  Running processes: {processes_info['running']}",
+        f"  Top CPU processes: {', '.join(processes_info['top_cpu'])}",
+        f"  Top memory processes: {', '.join(processes_info['top_memory'])}"
+    ]
+
+def _render_filesystem(fs_info):
+    """
+    Render the filesystem section of the enhanced prompt
+
+    Args:
+        fs_info: Result of PromptEnhancer.get_filesystem_info
+
+    Returns:
+        list: Lines of the section
+    """
+    lines = []
+    lines.append("Filesystem information:")
+    for disk in fs_info['disks'][:3]:
+        lines.append(f"  {disk['device']}: {disk['mountpoint']}, {disk['fstype']}, {disk['total_gb']}GB total, {disk['percent']}% used")
+    if len(fs_info['disks']) > 3:
+        lines.append(f"  ... and {len(fs_info['disks']) - 3} more filesystems")
+    lines.append(f"  Total file operations: {fs_info['io_read']} reads, {fs_info['io_write']} writes")
+    return lines
+
+def _render_services(services_info):
+    """
+    Render the services section of the enhanced prompt
+
+    Args:
+        services_info: Result of PromptEnhancer.get_services_info
+
+    Returns:
+        list: Lines of the section
+    """
+    lines = []
+    lines.append("System services:")
+    lines.append(f"  Running services: {services_info['running_count']}")
+    lines.append(f"  Critical services: {', '.join(services_info['critical'][:5])}")
+    if len(services_info['critical']) > 5:
+        lines.append(f"    ... and {len(services_info['critical']) - 5} more")
+    return lines
 
 class PromptEnhancer:
-    def __init__(self, logger):
+    # Every enhancement, in the order "all" renders them
+    ALL_ENHANCEMENTS = (
+        "time", "system", "network", "locale", "timezone",
+        "performance", "hardware", "users", "network_traffic",
+        "ports", "processes", "filesystem", "services"
+    )
+    _KNOWN_ENHANCEMENTS = frozenset(ALL_ENHANCEMENTS)
+
+    # Typical critical services, matched as case-insensitive substrings of the service names
+    _CRITICAL_SERVICES = (
+        "sshd", "httpd", "apache2", "nginx", "mysql", "mariadb",
+        "postgresql", "mongodb", "redis", "memcached", "docker", "containerd",
+        "firewalld", "ufw", "ntpd", "systemd", "networkmanager", "cron"
+    )
+    _WINDOWS_CRITICAL_SERVICES = (
+        "Windows Firewall", "Windows Defender", "Windows Update",
+        "SQL Server", "IIS", "DHCP", "DNS", "Print Spooler",
+        "Remote Desktop", "Windows Time"
+    )
+    # Single pass substring matchers of the critical names
+    _is_critical_service = staticmethod(_compile_matcher(_CRITICAL_SERVICES))
+    _is_critical_windows_service = staticmethod(_compile_matcher(_WINDOWS_CRITICAL_SERVICES))
+    _is_critical_process = staticmethod(_compile_matcher(_CRITICAL_SERVICES + _WINDOWS_CRITICAL_SERVICES))
+
+    def __init__(self, config, logger):
         """
         Initialize the prompt enhancer
 
         Args:
+            config: MareConfig containing the enhancement parameters
             logger: Logger instance to log events
         """
         self.logger = logger
 
+        # Results of the cached collectors, keyed by (qualified name, arguments): (value, expiry),
+        # with one lock per key so concurrent callers wait for a single computation
+        self._cache = {}
+        self._cache_locks = {}
+        self._cache_guard = threading.Lock()
+
+        # Prime the CPU and network counters so later reads are non-blocking
+        # deltas instead of sleeping for a full second each
+        psutil.cpu_percent(interval=None)
+        self._last_cpu_t = time.monotonic()
+        self._last_net = psutil.net_io_counters()
+        self._last_net_t = time.monotonic()
+
+        # Collector and renderer of each enhancement
+        self._dispatch = {
+            "time": (self.get_current_time_info, _render_time),
+            "system": (self.get_system_info, _render_system),
+            "network": (self.get_network_info, _render_network),
+            "locale": (self.get_locale_info, _render_locale),
+            "timezone": (self.get_timezone_info, _render_timezone),
+            "performance": (self.get_performance_metrics, _render_performance),
+            "hardware": (self.get_hardware_info, _render_hardware),
+            "users": (self.get_users_info, _render_users),
+            "network_traffic": (self.get_network_traffic, _render_network_traffic),
+            "ports": (self.get_open_ports, _render_ports),
+            "processes": (self.get_process_info, _render_processes),
+            "filesystem": (self.get_filesystem_info, _render_filesystem),
+            "services": (self.get_services_info, _render_services)
+        }
+
+        # Services sources, tried in order until one answers; the service managers
+        # are only used when enabled in config.conf, the process table always answers
+        self._service_collectors = []
+        if config.service_manager:
+            commands = self._resolve_service_commands()
+            for tool, collect in (
+                ("systemctl", self._services_from_systemctl),
+                ("service", self._services_from_sysv),
+                ("powershell", self._services_from_powershell)
+            ):
+                if tool in commands:
+                    self._service_collectors.append(functools.partial(collect, commands[tool]))
+        self._service_collectors.append(self._services_from_processes)
+
     def enhance_prompt(self, base_prompt, enhancements):
         """
         Enhance a prompt with additional information
@@ -36,145 +693,57 @@ class PromptEnhancer:
         Returns:
             str: The enhanced prompt
         """
-        info_sections = []
-
-        all_enhancements = [
-            "time", "system", "network", "locale", "timezone",
-            "performance", "hardware", "users", "network_traffic",
-            "ports", "processes", "filesystem", "services"
-        ]
+        if not enhancements:
+            return base_prompt
 
         if enhancements == "all" or "all" in enhancements:
-            enhancements_to_apply = all_enhancements
+            enhancements_to_apply = self.ALL_ENHANCEMENTS
         else:
-            enhancements_to_apply = enhancements
+            enhancements_to_apply = [name for name in enhancements if name in self._KNOWN_ENHANCEMENTS]
+            unknown = [name for name in enhancements if name not in self._KNOWN_ENHANCEMENTS]
+            if unknown:
+                self.logger.log_message(f"Ignoring unknown enhancements: {', '.join(unknown)}")
+
+        if not enhancements_to_apply:
+            return base_prompt
+
+        info_sections = []
+
+        # setlocale() is not thread-safe and changes how the other collectors'
+        # strftime() calls render: read the locale before starting any thread
+        results = {}
+        if "locale" in enhancements_to_apply:
+            results["locale"] = self._dispatch["locale"][0]()
+
+        # Most collectors wait on sockets, subprocesses or /proc: run them concurrently
+        futures = {
+            name: _run_in_thread(self._dispatch[name][0])
+            for name in enhancements_to_apply
+            if name not in results
+        }
+
+        # A stuck collector drops its section instead of delaying the reply or the exit
+        deadline = time.monotonic() + _COLLECT_TIMEOUT
+        for name, future in futures.items():
+            try:
+                results[name] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                self.logger.log_message(f"Enhancement {name} timed out after {_COLLECT_TIMEOUT}s, skipped")
+                results[name] = None
 
         for enhancement in enhancements_to_apply:
-            if enhancement == "time":
-                time_info = self.get_current_time_info()
-                if time_info:
-                    info_sections.append(f"Current time: {time_info['full']}")
-                    info_sections.append(f"UTC time: {time_info['utc']}")
-
-            elif enhancement == "system":
-                sys_info = self.get_system_info()
-                if sys_info:
-                    info_sections.append(f"System: {sys_info['os']} {sys_info['version']}")
-                    info_sections.append(f"CPU: {sys_info['cpu_model']} ({sys_info['cpu_cores']} cores, {sys_info['cpu']}% usage)")
-                    info_sections.append(f"RAM: {sys_info['memory_gb']}GB total, {sys_info['memory']}% used")
-                    info_sections.append(f"Disk: {sys_info['disk_total']}GB total, {sys_info['disk_percent']}% used")
-                    info_sections.append(f"System uptime: {sys_info['uptime']}")
-
-            elif enhancement == "network":
-                network_info = self.get_network_info()
-                if network_info:
-                    info_sections.append(f"Network: IP {network_info['local_ip']}, hostname {network_info['hostname']}")
-                    info_sections.append(f"Network interfaces: {', '.join(network_info['interfaces'])}")
-                    if network_info['internet_available']:
-                        info_sections.append(f"Internet connection: Available (latency: {network_info['latency']}ms)")
-                    else:
-                        info_sections.append("Internet connection: Unavailable")
-
-            elif enhancement == "locale":
-                locale_info = self.get_locale_info()
-                if locale_info:
-                    info_sections.append(f"System locale: {locale_info['language']}, {locale_info['encoding']}")
-                    info_sections.append(f"Currency: {locale_info['currency']}")
-                    info_sections.append(f"Time format: {locale_info['time_format']}")
-                    info_sections.append(f"Date format: {locale_info['date_format']}")
-
-            elif enhancement == "timezone":
-                timezone_info = self.get_timezone_info()
-                if timezone_info:
-                    info_sections.append(f"Timezone information:")
-                    info_sections.append(f"  Current timezone: {timezone_info['current']}")
-                    info_sections.append(f"  UTC offset: {timezone_info['utc_offset']}")
-                    info_sections.append(f"  DST active: {timezone_info['dst_active']}")
-
-            elif enhancement == "performance":
-                perf_info = self.get_performance_metrics()
-                if perf_info:
-                    info_sections.append("System performance:")
-                    info_sections.append(f"  CPU load: 1min: {perf_info['load_1']}, 5min: {perf_info['load_5']}, 15min: {perf_info['load_15']}")
-                    info_sections.append(f"  Process count: {perf_info['process_count']}")
-                    info_sections.append(f"  Network usage: {perf_info['network_sent']}MB sent, {perf_info['network_recv']}MB received")
-                    info_sections.append(f"  Swap usage: {perf_info['swap_percent']}%")
-
-            elif enhancement == "hardware":
-                hw_info = self.get_hardware_info()
-                if hw_info:
-                    info_sections.append("Hardware information:")
-                    info_sections.append(f"  Machine type: {hw_info['machine_type']}")
-                    info_sections.append(f"  Processor: {hw_info['processor']}")
-                    info_sections.append(f"  BIOS version: {hw_info['bios_version']}")
-                    info_sections.append(f"  Boot mode: {hw_info['boot_mode']}")
-
-            elif enhancement == "users":
-                users_info = self.get_users_info()
-                if users_info:
-                    info_sections.append("Users information:")
-                    info_sections.append(f"  Logged in users: {users_info['logged_users_count']}")
-                    users_list = ", ".join(users_info['logged_users'][:5])
-                    if len(users_info['logged_users']) > 5:
-                        users_list += f" and {len(users_info['logged_users']) - 5} more"
-                    info_sections.append(f"  Current users: {users_list}")
-                    info_sections.append(f"  System users: {users_info['system_users_count']}")
-                    info_sections.append(f"  User sessions: {users_info['sessions_count']}")
-
-            elif enhancement == "network_traffic":
-                traffic_info = self.get_network_traffic()
-                if traffic_info:
-                    info_sections.append("Network traffic:")
-                    info_sections.append(f"  Current download speed: {traffic_info['download_speed']} KB/s")
-                    info_sections.append(f"  Current upload speed: {traffic_info['upload_speed']} KB/s")
-                    info_sections.append(f"  Total downloaded: {traffic_info['total_received']} MB")
-                    info_sections.append(f"  Total uploaded: {traffic_info['total_sent']} MB")
-                    info_sections.append(f"  Packets received: {traffic_info['packets_recv']}")
-                    info_sections.append(f"  Packets sent: {traffic_info['packets_sent']}")
-
-            elif enhancement == "ports":
-                ports_info = self.get_open_ports()
-                if ports_info:
-                    info_sections.append("Open ports and connections:")
-                    info_sections.append(f"  Total connections: {ports_info['total_connections']}")
-                    info_sections.append(f"  Listening ports: {', '.join(map(str, ports_info['listening_ports'][:10]))}")
-                    if len(ports_info['listening_ports']) > 10:
-                        info_sections.append(f"    and {len(ports_info['listening_ports']) - 10} more...")
-                    info_sections.append(f"  Established connections: {ports_info['established']}")
-                    info_sections.append(f"  Top processes using network: {', '.join(ports_info['top_processes'])}")
-
-            elif enhancement == "processes":
-                processes_info = self.get_process_info()
-                if processes_info:
-                    info_sections.append("Process information:")
-                    info_sections.append(f"  Total processes: {processes_info['total']}")
-                    info_sections.append(f"  Running processes: {processes_info['running']}")
-                    info_sections.append(f"  Top CPU processes: {', '.join(processes_info['top_cpu'])}")
-                    info_sections.append(f"  Top memory processes: {', '.join(processes_info['top_memory'])}")
-
-            elif enhancement == "filesystem":
-                fs_info = self.get_filesystem_info()
-                if fs_info:
-                    info_sections.append("Filesystem information:")
-                    for disk in fs_info['disks'][:3]:
-                        info_sections.append(f"  {disk['device']}: {disk['mountpoint']}, {disk['fstype']}, {disk['total_gb']}GB total, {disk['percent']}% used")
-                    if len(fs_info['disks']) > 3:
-                        info_sections.append(f"  ... and {len(fs_info['disks']) - 3} more filesystems")
-                    info_sections.append(f"  Total file operations: {fs_info['io_read']} reads, {fs_info['io_write']} writes")
-
-            elif enhancement == "services":
-                services_info = self.get_services_info()
-                if services_info:
-                    info_sections.append("System services:")
-                    info_sections.append(f"  Running services: {services_info['running_count']}")
-                    info_sections.append(f"  Critical services: {', '.join(services_info['critical'][:5])}")
-                    if len(services_info['critical']) > 5:
-                        info_sections.append(f"    ... and {len(services_info['critical']) - 5} more")
+            info = results[enhancement]
+            if info:
+                render = self._dispatch[enhancement][1]
+                info_sections.extend(render(info))
 
         if info_sections:
-            info_text = "\n".join(info_sections)
-            enriched_prompt = f"{base_prompt}\n\nHere is real-time information you can use if relevant:\n{info_text}\n\nThe email is:"
-            return enriched_prompt
+            # Join the framing and the sections at once, without an intermediate info text
+            return "\n".join([
+                f"{base_prompt}\n\nHere is real-time information you can use if relevant:",
+                *info_sections,
+                "\nThe email is:"
+            ])
 
         return base_prompt
 
@@ -185,8 +754,10 @@ class PromptEnhancer:
         Returns:
             dict: Date and time information
         """
-        now_local = datetime.now()
-        now_utc = datetime.utcnow()
+        # One clock read so the local, UTC and timestamp values agree
+        ts = time.time()
+        now_local = datetime.fromtimestamp(ts)
+        now_utc = datetime.fromtimestamp(ts, tz=timezone.utc)
 
         # Detect local timezone
         local_tz = time.tzname[0]
@@ -201,9 +772,10 @@ class PromptEnhancer:
             "time": time_str,
             "full": f"{weekday}, {date} {time_str} ({local_tz})",
             "utc": now_utc.strftime('%Y-%m-%d %H:%M:%S UTC'),
-            "timestamp": int(time.time())
+            "timestamp": int(ts)
         }
 
+    @_ttl_cache(2)
     def get_system_info(self):
         """
         Retrieve detailed system information
@@ -213,22 +785,19 @@ class PromptEnhancer:
         """
         try:
             # OS info
-            os_name = platform.system()
-            os_version = platform.release()
+            os_name, os_version = _os_tuple()
 
             # CPU info
-            cpu_usage = psutil.cpu_percent(interval=1)
+            # Usage since the priming in __init__, over at least _SAMPLE_FLOOR seconds
+            remaining = _SAMPLE_FLOOR - (time.monotonic() - self._last_cpu_t)
+            if remaining > 0:
+                time.sleep(remaining)
+            cpu_usage = psutil.cpu_percent(interval=None)
+            self._last_cpu_t = time.monotonic()
             cpu_cores = psutil.cpu_count(logical=True)
             cpu_physical = psutil.cpu_count(logical=False)
 
-            try:
-                if platform.system() == "Windows":
-                    cpu_model = platform.processor()
-                else:
-                    cmd = "cat /proc/cpuinfo | grep 'model name' | uniq"
-                    cpu_model = subprocess.check_output(cmd, shell=True).decode().strip().split(":")[1].strip()
-            except:
-                cpu_model = "Unknown CPU"
+            cpu_model = _cpu_model()
 
             # Memory info
             memory = psutil.virtual_memory()
@@ -241,7 +810,7 @@ class PromptEnhancer:
             disk_percent = disk.percent
 
             # Uptime
-            boot_time = datetime.fromtimestamp(psutil.boot_time())
+            boot_time = _boot_datetime()
             uptime = datetime.now() - boot_time
             uptime_days = uptime.days
             uptime_hours = uptime.seconds // 3600
@@ -261,9 +830,10 @@ class PromptEnhancer:
                 "uptime": f"{uptime_days} days, {uptime_hours} hours, {uptime_minutes} minutes"
             }
         except Exception as e:
-            self.logger.log_message(f"Error getting system info: {str(e)}")
+            self.logger.log_message(f"Error getting system info: {str(e)}", level=logging.ERROR)
             return None
 
+    @_ttl_cache(30)
     def get_network_info(self):
         """
         Retrieve network information
@@ -287,7 +857,7 @@ class PromptEnhancer:
                 s.close()
 
             # MAC address
-            mac = ':'.join(['{:02x}'.format((uuid.getnode() >> ele) & 0xff) for ele in range(0, 8*6, 8)][::-1])
+            mac = _mac_address()
 
             # Network interfaces
             interfaces = []
@@ -298,11 +868,12 @@ class PromptEnhancer:
             internet_available = False
             latency = -1
             try:
-                start = time.time()
-                requests.get('https://www.google.com', timeout=2)
-                latency = round((time.time() - start) * 1000, 2)
+                # A TCP handshake with a public DNS server takes a single round trip
+                start = time.monotonic()
+                with socket.create_connection(('1.1.1.1', 53), timeout=1):
+                    latency = round((time.monotonic() - start) * 1000, 2)
                 internet_available = True
-            except:
+            except OSError:
                 pass
 
             return {
@@ -314,9 +885,10 @@ class PromptEnhancer:
                 "latency": latency
             }
         except Exception as e:
-            self.logger.log_message(f"Error getting network info: {str(e)}")
+            self.logger.log_message(f"Error getting network info: {str(e)}", level=logging.ERROR)
             return None
 
+    @_ttl_cache(300)
     def get_locale_info(self):
         """
         Retrieve system locale information
@@ -327,7 +899,9 @@ class PromptEnhancer:
         try:
             current_locale = locale.getlocale()
 
-            # Try to retrieve formats
+            # Try to retrieve formats; the locale is process-global, so it is
+            # switched to the user's one only for these reads, then restored
+            previous_locale = locale.setlocale(locale.LC_ALL)
             try:
                 locale.setlocale(locale.LC_ALL, '')
                 currency_symbol = locale.localeconv()['currency_symbol']
@@ -337,6 +911,8 @@ class PromptEnhancer:
                 currency_symbol = "Unknown"
                 time_format = "Unknown"
                 date_format = "Unknown"
+            finally:
+                locale.setlocale(locale.LC_ALL, previous_locale)
 
             return {
                 "language": current_locale[0] if current_locale[0] else "Unknown",
@@ -346,9 +922,10 @@ class PromptEnhancer:
                 "date_format": date_format
             }
         except Exception as e:
-            self.logger.log_message(f"Error getting locale info: {str(e)}")
+            self.logger.log_message(f"Error getting locale info: {str(e)}", level=logging.ERROR)
             return None
 
+    @_ttl_cache(300)
     def get_timezone_info(self):
         """
         Retrieve detailed timezone information
@@ -369,7 +946,7 @@ class PromptEnhancer:
             is_dst = bool(time.localtime().tm_isdst)
 
             # List of available timezones
-            available_timezones = pytz.all_timezones[:5]  # Just a few examples
+            available_timezones = list(_tz_examples())  # Just a few examples
 
             return {
                 "current": local_zone,
@@ -378,9 +955,10 @@ class PromptEnhancer:
                 "examples": available_timezones
             }
         except Exception as e:
-            self.logger.log_message(f"Error getting timezone info: {str(e)}")
+            self.logger.log_message(f"Error getting timezone info: {str(e)}", level=logging.ERROR)
             return None
 
+    @_ttl_cache(2)
     def get_performance_metrics(self):
         """
         Retrieve system performance metrics
@@ -405,7 +983,7 @@ class PromptEnhancer:
             swap_percent = swap.percent
 
             # Process start times
-            boot_time = datetime.fromtimestamp(psutil.boot_time())
+            boot_time = _boot_datetime()
 
             return {
                 "load_1": load_1,
@@ -418,9 +996,10 @@ class PromptEnhancer:
                 "boot_time": boot_time.strftime("%Y-%m-%d %H:%M:%S")
             }
         except Exception as e:
-            self.logger.log_message(f"Error getting performance metrics: {str(e)}")
+            self.logger.log_message(f"Error getting performance metrics: {str(e)}", level=logging.ERROR)
             return None
 
+    @_ttl_cache(300)
     def get_hardware_info(self):
         """
         Retrieve hardware information
@@ -432,25 +1011,8 @@ class PromptEnhancer:
             machine_type = platform.machine()
             processor = platform.processor()
 
-            bios_version = "Unknown"
-            if platform.system() == "Windows":
-                try:
-                    import wmi
-                    c = wmi.WMI()
-                    for bios in c.Win32_BIOS():
-                        bios_version = bios.Version
-                except:
-                    pass
-
-            boot_mode = "Unknown"
-            if platform.system() == "Linux":
-                try:
-                    if os.path.exists('/sys/firmware/efi'):
-                        boot_mode = "UEFI"
-                    else:
-                        boot_mode = "Legacy BIOS"
-                except:
-                    pass
+            bios_version = _bios_version()
+            boot_mode = _boot_mode()
 
             return {
                 "machine_type": machine_type,
@@ -459,9 +1021,10 @@ class PromptEnhancer:
                 "boot_mode": boot_mode
             }
         except Exception as e:
-            self.logger.log_message(f"Error getting hardware info: {str(e)}")
+            self.logger.log_message(f"Error getting hardware info: {str(e)}", level=logging.ERROR)
             return None
 
+    @_ttl_cache(30)
     def get_users_info(self):
         """
         Retrieve system user information
@@ -480,8 +1043,7 @@ class PromptEnhancer:
             except:
                 # Alternative method for Unix
                 try:
-                    output = subprocess.check_output(["who"]).decode()
-                    for line in output.split('\n'):
+                    for line in _stream_lines(["who"]):
                         if line.strip():
                             username = line.split()[0]
                             if username not in logged_users:
@@ -491,22 +1053,7 @@ class PromptEnhancer:
                     pass
 
             # All system users
-            system_users = []
-            try:
-                if platform.system() != "Windows":
-                    # Unix method
-                    for p in pwd.getpwall():
-                        system_users.append(p[0])
-                else:
-                    # Windows method
-                    output = subprocess.check_output(["net", "user"]).decode()
-                    for line in output.split('\n'):
-                        line = line.strip()
-                        if line and not line.startswith('-') and not line.startswith('User accounts') and not line.startswith('The command'):
-                            users = line.split()
-                            system_users.extend(users)
-            except:
-                pass
+            system_users = list(_system_users_list())
 
             return {
                 "logged_users": logged_users,
@@ -516,9 +1063,10 @@ class PromptEnhancer:
                 "sessions_count": sessions_count
             }
         except Exception as e:
-            self.logger.log_message(f"Error getting users info: {str(e)}")
+            self.logger.log_message(f"Error getting users info: {str(e)}", level=logging.ERROR)
             return None
 
+    @_ttl_cache(2)
     def get_network_traffic(self):
         """
         Retrieve current network traffic information
@@ -527,18 +1075,17 @@ class PromptEnhancer:
             dict: Network traffic information or None in case of error
         """
         try:
-            # First measurement
-            net_io1 = psutil.net_io_counters()
-
-            # Wait a bit to calculate speed
-            time.sleep(1)
-
-            # Second measurement
-            net_io2 = psutil.net_io_counters()
-
-            # Calculate speed
-            download_speed = round((net_io2.bytes_recv - net_io1.bytes_recv) / 1024, 2)  # KB/s
-            upload_speed = round((net_io2.bytes_sent - net_io1.bytes_sent) / 1024, 2)    # KB/s
+            # Speed since the previous measurement, over at least _SAMPLE_FLOOR seconds
+            net_io1, time1 = self._last_net, self._last_net_t
+            remaining = _SAMPLE_FLOOR - (time.monotonic() - time1)
+            if remaining > 0:
+                time.sleep(remaining)
+            net_io2, time2 = psutil.net_io_counters(), time.monotonic()
+            self._last_net, self._last_net_t = net_io2, time2
+
+            elapsed = time2 - time1
+            download_speed = round((net_io2.bytes_recv - net_io1.bytes_recv) / elapsed / 1024, 2)  # KB/s
+            upload_speed = round((net_io2.bytes_sent - net_io1.bytes_sent) / elapsed / 1024, 2)    # KB/s
 
             # Totals
             total_sent = round(net_io2.bytes_sent / (1024 * 1024), 2)     # MB
@@ -573,9 +1120,10 @@ class PromptEnhancer:
                 "interfaces": interfaces_stats
             }
         except Exception as e:
-            self.logger.log_message(f"Error getting network traffic: {str(e)}")
+            self.logger.log_message(f"Error getting network traffic: {str(e)}", level=logging.ERROR)
             return None
 
+    @_ttl_cache(2)
     def get_open_ports(self):
         """
         Retrieve information about open ports and network connections
@@ -584,12 +1132,16 @@ class PromptEnhancer:
             dict: Ports and connections information or None in case of error
         """
         try:
-            connections = psutil.net_connections()
+            # TCP and UDP sockets only, unix sockets have no port
+            connections = psutil.net_connections(kind='inet')
+
+            # Resolve the name of each owning process once, kernel sockets have no pid
+            pids = {conn.pid for conn in connections if conn.pid}
+            pid_names = {pid: name for pid, name in (self._process_names() or {}).items() if pid in pids}
 
             # Listening ports
             listening_ports = []
             established = 0
-            process_connections = defaultdict(int)
 
             for conn in connections:
                 # Listening ports (servers)
@@ -600,24 +1152,15 @@ class PromptEnhancer:
                 if conn.status == 'ESTABLISHED':
                     established += 1
 
-                # Count per process
-                if conn.pid:
-                    try:
-                        proc = psutil.Process(conn.pid)
-                        process_connections[proc.name()] += 1
-                    except:
-                        pass
-
             # Top processes by number of connections
-            top_processes = []
-            for proc, count in sorted(process_connections.items(), key=lambda x: x[1], reverse=True)[:5]:
-                top_processes.append(f"{proc} ({count})")
+            process_connections = Counter(pid_names.get(conn.pid) for conn in connections if conn.pid)
+            process_connections.pop(None, None)  # Processes that exited meanwhile
+            top_processes = [f"{proc} ({count})" for proc, count in process_connections.most_common(5)]
 
             # Alternative method for Linux
-            if not listening_ports and platform.system() == "Linux":
+            if not listening_ports and _SYSTEM == "Linux":
                 try:
-                    output = subprocess.check_output(["netstat", "-tuln"]).decode()
-                    for line in output.split('\n'):
+                    for line in _stream_lines(["netstat", "-tuln"]):
                         if "LISTEN" in line:
                             parts = line.split()
                             if len(parts) >= 4:
@@ -639,9 +1182,10 @@ class PromptEnhancer:
                 "top_processes": top_processes
             }
         except Exception as e:
-            self.logger.log_message(f"Error getting open ports: {str(e)}")
+            self.logger.log_message(f"Error getting open ports: {str(e)}", level=logging.ERROR)
             return None
 
+    @_ttl_cache(2)
     def get_process_info(self):
         """
         Retrieve information about running processes
@@ -653,9 +1197,14 @@ class PromptEnhancer:
             procs = []
             running_count = 0
 
-            for proc in psutil.process_iter(['pid', 'name', 'username', 'status', 'cpu_percent', 'memory_percent']):
+            # process_iter() reads the attributes through as_dict(), which already batches
+            # the /proc reads of each process with oneshot(); only ask for what is used
+            for proc in psutil.process_iter(['name', 'status', 'cpu_percent', 'memory_percent']):
                 try:
                     pinfo = proc.info
+                    # Values psutil could not read (access denied) count as 0
+                    pinfo['cpu_percent'] = pinfo['cpu_percent'] or 0.0
+                    pinfo['memory_percent'] = pinfo['memory_percent'] or 0.0
                     procs.append(pinfo)
                     if pinfo['status'] == 'running':
                         running_count += 1
@@ -663,16 +1212,18 @@ class PromptEnhancer:
                     pass
 
             # Sort by CPU usage
-            top_cpu = []
-            for p in sorted(procs, key=lambda p: p.get('cpu_percent', 0), reverse=True)[:5]:
-                if p.get('cpu_percent', 0) > 0:
-                    top_cpu.append(f"{p['name']} ({p['cpu_percent']:.1f}%)")
+            top_cpu = [
+                f"{p['name']} ({p['cpu_percent']:.1f}%)"
+                for p in nlargest(5, procs, key=itemgetter('cpu_percent'))
+                if p['cpu_percent'] > 0
+            ]
 
             # Sort by memory usage
-            top_memory = []
-            for p in sorted(procs, key=lambda p: p.get('memory_percent', 0), reverse=True)[:5]:
-                if p.get('memory_percent', 0) > 0:
-                    top_memory.append(f"{p['name']} ({p['memory_percent']:.1f}%)")
+            top_memory = [
+                f"{p['name']} ({p['memory_percent']:.1f}%)"
+                for p in nlargest(5, procs, key=itemgetter('memory_percent'))
+                if p['memory_percent'] > 0
+            ]
 
             return {
                 "total": len(procs),
@@ -681,9 +1232,10 @@ class PromptEnhancer:
                 "top_memory": top_memory
             }
         except Exception as e:
-            self.logger.log_message(f"Error getting process info: {str(e)}")
+            self.logger.log_message(f"Error getting process info: {str(e)}", level=logging.ERROR)
             return None
 
+    @_ttl_cache(30)
     def get_filesystem_info(self):
         """
         Retrieve detailed filesystem information
@@ -694,19 +1246,23 @@ class PromptEnhancer:
         try:
             # Disk information
             disks = []
-            for partition in psutil.disk_partitions():
-                try:
-                    usage = psutil.disk_usage(partition.mountpoint)
-                    disks.append({
-                        "device": partition.device,
-                        "mountpoint": partition.mountpoint,
-                        "fstype": partition.fstype,
-                        "total_gb": round(usage.total / (1024**3), 2),
-                        "used_gb": round(usage.used / (1024**3), 2),
-                        "percent": usage.percent
-                    })
-                except:
-                    pass
+            partitions = psutil.disk_partitions()
+
+            # statvfs() can block on slow or network mounts: query them concurrently
+            futures = [_run_in_thread(_safe_usage, partition.mountpoint) for partition in partitions]
+            usages = [future.result() for future in futures]
+
+            for partition, usage in zip(partitions, usages):
+                if usage is None:
+                    continue
+                disks.append({
+                    "device": partition.device,
+                    "mountpoint": partition.mountpoint,
+                    "fstype": partition.fstype,
+                    "total_gb": round(usage.total / (1024**3), 2),
+                    "used_gb": round(usage.used / (1024**3), 2),
+                    "percent": usage.percent
+                })
 
             # IO Counters
             io_counters = psutil.disk_io_counters()
@@ -719,96 +1275,196 @@ class PromptEnhancer:
                 "io_write": io_write
             }
         except Exception as e:
-            self.logger.log_message(f"Error getting filesystem info: {str(e)}")
+            self.logger.log_message(f"Error getting filesystem info: {str(e)}", level=logging.ERROR)
             return None
 
-    def get_services_info(self):
+    @_ttl_cache(30)
+    def get_services_info(self, include_full_list=False):
         """
         Retrieve system services information
 
+        Running processes are inspected in-process by default, the service
+        manager is only queried when enabled in config.conf
+
+        Args:
+            include_full_list: If True, also return the name of every running service
+
         Returns:
             dict: Services information or None in case of error
         """
         try:
-            services = []
-            critical_services = []
-
-            # List of typical critical services
-            critical_service_names = [
-                "sshd", "httpd", "apache2", "nginx", "mysql", "mariadb",
-                "postgresql", "mongodb", "redis", "memcached", "docker", "containerd",
-                "firewalld", "ufw", "ntpd", "systemd", "networkmanager", "cron"
-            ]
-
-            # Method for Linux (systemd)
-            if platform.system() == "Linux":
-                try:
-                    output = subprocess.check_output(["systemctl", "list-units", "--type=service", "--state=running"]).decode()
-                    service_count = 0
-
-                    for line in output.split('\n'):
-                        if '.service' in line and 'running' in line:
-                            service_count += 1
-                            service_name = line.split('.service')[0].strip()
-                            services.append(service_name)
-
-                            # Check if it's a critical service
-                            for critical in critical_service_names:
-                                if critical in service_name.lower():
-                                    critical_services.append(service_name)
-                                    break
-                except:
-                    # Alternative for non-systemd Linux
-                    try:
-                        output = subprocess.check_output(["service", "--status-all"]).decode()
-                        for line in output.split('\n'):
-                            if '[ + ]' in line:  # Active service
-                                service_count += 1
-                                service_name = line.split('[ + ]')[1].strip()
-                                services.append(service_name)
-
-                                # Check if it's a critical service
-                                for critical in critical_service_names:
-                                    if critical in service_name.lower():
-                                        critical_services.append(service_name)
-                                        break
-                    except:
-                        pass
-
-            # Method for Windows
-            elif platform.system() == "Windows":
-                try:
-                    output = subprocess.check_output(["net", "start"]).decode()
-                    services = []
-                    for line in output.split('\n'):
-                        line = line.strip()
-                        if line and not line.startswith('The following') and not line.startswith('The command'):
-                            services.append(line)
-
-                            # Check critical Windows services
-                            windows_critical = ["Windows Firewall", "Windows Defender", "Windows Update",
-                                               "SQL Server", "IIS", "DHCP", "DNS", "Print Spooler",
-                                               "Remote Desktop", "Windows Time"]
-                            for critical in windows_critical:
-                                if critical.lower() in line.lower():
-                                    critical_services.append(line)
-                                    break
-                except:
-                    pass
+            for collect in self._service_collectors:
+                result = collect(include_full_list)
+                if result is not None:
+                    break
+            else:
+                # Not even the process table could be read in time
+                return None
+            running_count, services, critical_services = result
+
+            services_info = {
+                "running_count": running_count,
+                "critical": list(critical_services)
+            }
+            if include_full_list:
+                services_info["services"] = services
+            return services_info
+        except Exception as e:
+            self.logger.log_message(f"Error getting services info: {str(e)}", level=logging.ERROR)
+            return None
 
-            # If no info was obtained, try with psutil
-            if not services:
-                for proc in psutil.process_iter(['pid', 'name']):
-                    for critical in critical_service_names:
-                        if critical in proc.info['name'].lower():
-                            critical_services.append(proc.info['name'])
-                            break
+    @staticmethod
+    def _resolve_service_commands():
+        """
+        Resolve the full command lines of the service managers available on this system
 
-            return {
-                "running_count": len(services),
-                "services": services,
-                "critical": list(set(critical_services))  # Remove duplicates
+        Returns:
+            dict: {tool name: argv list} for every tool found in the PATH
+        """
+        commands = {
+            "Linux": {
+                "systemctl": ["list-units", "--type=service", "--state=running", "--no-legend", "--plain", "--no-pager"],
+                "service": ["--status-all"]
+            },
+            "Windows": {
+                # One display name per line, no header to filter out
+                "powershell": [
+                    "-NoProfile", "-NonInteractive", "-Command",
+                    "Get-Service | Where-Object Status -eq Running | ForEach-Object DisplayName"
+                ]
             }
-        except Exception as e:
-            self.logger.log_message(f"Error getting services info: {str(e)}")
+        }.get(_SYSTEM, {})
+
+        resolved = {}
+        for tool, args in commands.items():
+            path = shutil.which(tool)
+            if path:
+                resolved[tool] = [path, *args]
+        return resolved
+
+    @_ttl_cache(1.5)
+    def _process_names(self):
+        """
+        Snapshot the name of every running process, kernel threads excluded on Linux
+
+        Collectors running close together share one walk of the process table
+
+        Returns:
+            dict: {pid: process name}
+        """
+        if _SYSTEM == "Linux":
+            return _linux_process_names()
+        return {proc.pid: proc.info['name'] for proc in psutil.process_iter(['name'])}
+
+    def _services_from_processes(self, include_full_list):
+        """
+        Retrieve the running services from the process table
+
+        Args:
+            include_full_list: If True, also return the sorted process names
+
+        Returns:
+            tuple: (count, process names or None, set of critical process names), or None if
+                the process table snapshot timed out
+        """
+        names = self._process_names()
+        if names is None:
+            return None
+
+        # Zombie or exiting processes may have no name
+        services = {name for name in names.values() if name}
+        critical_services = {name for name in services if self._is_critical_process(name)}
+        return len(services), sorted(services) if include_full_list else None, critical_services
+
+    def _services_from_systemctl(self, argv, include_full_list):
+        """
+        Retrieve the running services from systemctl
+
+        Args:
+            argv: Resolved systemctl command line
+            include_full_list: If True, also return the service names
+
+        Returns:
+            tuple: (count, service names or None, set of critical service names) or None if systemctl failed
+        """
+        running_count = 0
+        services = [] if include_full_list else None
+        critical_services = set()
+        try:
+            # --state=running already filters the units: only the first column is needed
+            for line in _stream_lines(argv):
+                unit = line.split(None, 1)
+                if unit and unit[0].endswith('.service'):
+                    service_name = unit[0][:-len('.service')]
+                    running_count += 1
+                    if services is not None:
+                        services.append(service_name)
+
+                    # Check if it's a critical service
+                    if self._is_critical_service(service_name):
+                        critical_services.add(service_name)
+        except (subprocess.SubprocessError, OSError) as e:
+            self.logger.log_message(f"systemctl failed: {str(e)}")
+            return None
+        return running_count, services, critical_services
+
+    def _services_from_sysv(self, argv, include_full_list):
+        """
+        Retrieve the running services from service --status-all (non-systemd Linux)
+
+        Args:
+            argv: Resolved service command line
+            include_full_list: If True, also return the service names
+
+        Returns:
+            tuple: (count, service names or None, set of critical service names) or None if service failed
+        """
+        running_count = 0
+        services = [] if include_full_list else None
+        critical_services = set()
+        try:
+            for line in _stream_lines(argv):
+                match = _SVC_RE.match(line)
+                if match:  # Active service
+                    service_name = match.group(1)
+                    running_count += 1
+                    if services is not None:
+                        services.append(service_name)
+
+                    # Check if it's a critical service
+                    if self._is_critical_service(service_name):
+                        critical_services.add(service_name)
+        except (subprocess.SubprocessError, OSError) as e:
+            self.logger.log_message(f"service --status-all failed: {str(e)}")
+            return None
+        return running_count, services, critical_services
+
+    def _services_from_powershell(self, argv, include_full_list):
+        """
+        Retrieve the running services from PowerShell Get-Service (Windows)
+
+        Args:
+            argv: Resolved powershell command line
+            include_full_list: If True, also return the service names
+
+        Returns:
+            tuple: (count, service names or None, set of critical service names) or None if powershell failed
+        """
+        running_count = 0
+        services = [] if include_full_list else None
+        critical_services = set()
+        try:
+            for line in _stream_lines(argv, timeout=_POWERSHELL_TIMEOUT):
+                line = line.strip()
+                if line:
+                    running_count += 1
+                    if services is not None:
+                        services.append(line)
+
+                    # Check critical Windows services
+                    if self._is_critical_windows_service(line):
+                        critical_services.add(line)
+        except (subprocess.SubprocessError, OSError) as e:
+            self.logger.log_message(f"Get-Service failed: {str(e)}")
             return None
+        return running_count, services, critical_services
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import logging
 import os
 
 class ResponseFormatter:
@@ -12,7 +13,7 @@ class ResponseFormatter:
             config: Configuration contenant les paramètres du template
             logger: Instance du logger pour enregistrer les événements
         """
-        self.html_template_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', config.get('Templates', 'html_template_path'))
+        self.html_template_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', config.html_template_path)
         self.logger = logger
 
     def read_html_template(self):
@@ -26,7 +27,7 @@ class ResponseFormatter:
             with open(self.html_template_path, 'r', encoding='utf-8') as file:
                 return file.read()
         except Exception as e:
-            self.logger.log_message(f"Error reading HTML template: {str(e)}")
+            self.logger.log_message(f"Error reading HTML template: {str(e)}", level=logging.ERROR)
             return """<!DOCTYPE html>
 <html>
 <head><title>MareChan Response</title></head>
@@ -35,13 +36,13 @@ class ResponseFormatter:
 </body>
 </html>"""
 
-    def create_html_response(self, response_data, assistant_config):
+    def create_html_response(self, response_data, assistant):
         """
         Crée une réponse HTML formatée
 
         Args:
             response_data: Données de la réponse
-            assistant_config: Configuration de l'assistant
+            assistant: Assistant qui répond
 
         Returns:
             str: Réponse HTML formatée
@@ -67,5 +68,5 @@ class ResponseFormatter:
             return html_response
 
         except Exception as e:
-            self.logger.log_message(f"Error creating HTML response: {str(e)}")
+            self.logger.log_message(f"Error creating HTML response: {str(e)}", level=logging.ERROR)
             return f"<html><body><p>{response_data.get('message', '')}</p><p><small>This is an automated response generated by AI, and the responses may be incorrect.</small></p></body></html>"
\ No newline at end of file